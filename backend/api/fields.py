@@ -0,0 +1,152 @@
+import base64
+import binascii
+import re
+import tempfile
+import uuid
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+import core.constants as cnsts
+from core.image_worker import IMAGE_EXTENSIONS, read_image_header
+
+NON_BASE64_RE = re.compile(r'[^A-Za-z0-9+/=]')
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Поле первичного ключа с предзагрузкой объектов одним запросом.
+
+    После ``preload`` поле отвечает из загруженных объектов, сохраняя
+    стандартные сообщения об ошибках ``PrimaryKeyRelatedField``.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.preloaded = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        if isinstance(data, bool):
+            raise TypeError
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def preload(self, values):
+        pks = set()
+        for data in values:
+            try:
+                pks.add(self.to_pk(data))
+            except (TypeError, DjangoValidationError):
+                continue
+        self.preloaded = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return self.preloaded[self.to_pk(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Список связей, все id которого загружаются одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, (list, tuple)):
+            self.child_relation.preload(data)
+        return super().to_internal_value(data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Список вложенных объектов с предзагрузкой связанного поля.
+
+    Имя поля дочернего сериализатора задаётся в ``Meta.bulk_field``.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            field_name = self.child.Meta.bulk_field
+            self.child.fields[field_name].preload(
+                item.get(field_name) for item in data
+                if isinstance(item, dict)
+            )
+        return super().to_internal_value(data)
+
+
+class IngestImageField(serializers.FileField):
+    """Изображение из base64-строки или multipart-файла.
+
+    Данные сразу пишутся во временный файл на диске, а формат и размеры
+    проверяются по заголовку без декодирования пикселей. Полная проверка
+    и нормализация выполняются в фоне (см. ``core.images``).
+    """
+
+    default_error_messages = {
+        'invalid_image': Base64ImageField.INVALID_FILE_MESSAGE,
+        'invalid_type': 'Ожидается base64-строка или файл изображения.',
+        'too_large': 'Размер изображения не должен превышать {max_size} байт.',
+    }
+
+    def to_internal_value(self, data):
+        if data in ('', None):
+            return None
+        if isinstance(data, str):
+            upload = self.spool_base64(data)
+        elif isinstance(data, UploadedFile):
+            upload = data
+        else:
+            self.fail('invalid_type')
+        if upload.size > cnsts.MAX_IMAGE_UPLOAD_SIZE:
+            self.fail('too_large', max_size=cnsts.MAX_IMAGE_UPLOAD_SIZE)
+        header = read_image_header(upload)
+        if header is None:
+            self.fail('invalid_image')
+        upload.name = f'{uuid.uuid4()}.{IMAGE_EXTENSIONS[header[0]]}'
+        return super().to_internal_value(upload)
+
+    def spool_base64(self, data):
+        """Декодирует base64 по частям во временный файл.
+
+        Как и ``base64.b64decode``, пропускает символы вне алфавита,
+        например переводы строк; остаток части, не кратный четырём
+        символам, переносится в следующую.
+        """
+        start = data.find(';base64,') + 1
+        if start:
+            start += len('base64,')
+        file = tempfile.SpooledTemporaryFile(
+            max_size=cnsts.BASE64_CHUNK_SIZE
+        )
+        remainder = ''
+        try:
+            for offset in range(start, len(data), cnsts.BASE64_CHUNK_SIZE):
+                chunk = remainder + NON_BASE64_RE.sub(
+                    '', data[offset:offset + cnsts.BASE64_CHUNK_SIZE]
+                )
+                end = len(chunk) - len(chunk) % 4
+                remainder = chunk[end:]
+                file.write(base64.b64decode(chunk[:end]))
+                if file.tell() > cnsts.MAX_IMAGE_UPLOAD_SIZE:
+                    file.close()
+                    self.fail(
+                        'too_large', max_size=cnsts.MAX_IMAGE_UPLOAD_SIZE
+                    )
+            file.write(base64.b64decode(remainder))
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_image')
+        size = file.tell()
+        file.seek(0)
+        return UploadedFile(file, 'upload', size=size)
@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 
+from core.recipe_search import search_recipes
 from recipes.models import Recipe, Tag
 
 
@@ -16,10 +17,16 @@ class RecipeFilter(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
+
+    # Фильтры, результат которых зависит от пользователя.
+    viewer_scoped_filters = ('is_favorited', 'is_in_shopping_cart')
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags', 'author', 'is_favorited', 'is_in_shopping_cart', 'search'
+        )
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -32,3 +39,6 @@ class RecipeFilter(filters.FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(in_shoppingcarts__user=user)
         return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
@@ -1,5 +1,287 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+from datetime import datetime
 
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    LimitOffsetPagination,
+    PageNumberPagination
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class LimitPageNumberPagination(PageNumberPagination):
+import core.constants as cnsts
+from core.response_cache import get_recipes_generation
+
+
+def estimate_count(queryset):
+    """Функция оценки числа строк таблицы по статистике планировщика."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            (queryset.model._meta.db_table,)
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row else None
+
+
+def get_count(queryset, exact=False, cacheable=True):
+    """Функция подсчёта объектов для пагинации.
+
+    Для больших таблиц без фильтров используется оценка планировщика
+    Postgres, в остальных случаях точный результат кэшируется на короткое
+    время для каждой комбинации фильтров в текущем поколении кэша
+    рецептов. Наборы, зависящие от зрителя, не кэшируются.
+    """
+    if exact:
+        return queryset.count()
+    if not queryset.query.where:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= cnsts.COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+    if not cacheable:
+        return queryset.count()
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return 0
+    key = f'count:{get_recipes_generation()}:' + hashlib.md5(
+        sql.encode()
+    ).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, cnsts.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def correct_count(count, offset, size, has_next):
+    """Функция согласования приблизительного количества со страницей.
+
+    Страница выбирается с одной лишней строкой, поэтому количество
+    не может оказаться меньше увиденного, а на последней странице
+    известно точно.
+    """
+    if has_next:
+        return max(count, offset + size + 1)
+    if size or not offset:
+        return offset + size
+    return count
+
+
+class CountStrategyMixin:
+    """Выбор стратегии подсчёта; ``?exact_count=1`` включает точный COUNT.
+
+    Количество только сообщается клиенту: размер страницы и ссылка на
+    следующую определяются выборкой на одну строку больше. Представление
+    может объявить свой набор зависящим от зрителя методом
+    ``has_viewer_scoped_queryset``, тогда количество не кэшируется.
+    """
+
+    exact_count_query_param = 'exact_count'
+
+    def is_exact_count(self, request):
+        return request.query_params.get(
+            self.exact_count_query_param
+        ) in ('1', 'true', 'True')
+
+    def is_count_cacheable(self, view):
+        has_viewer_scoped_queryset = getattr(
+            view, 'has_viewer_scoped_queryset', None
+        )
+        return not (has_viewer_scoped_queryset
+                    and has_viewer_scoped_queryset())
+
+
+class CountStrategyPage(Page):
+    """Страница, знающая о следующей без общего количества."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CountStrategyPaginator(Paginator):
+    exact = False
+    cacheable = True
+
+    @cached_property
+    def count(self):
+        return get_count(
+            self.object_list, exact=self.exact, cacheable=self.cacheable
+        )
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является целым числом.')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1.')
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset:offset + self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов.')
+        if has_next or 'count' in self.__dict__:
+            self.count = correct_count(
+                self.count, offset, len(rows), has_next
+            )
+        else:
+            self.count = offset + len(rows)
+        return CountStrategyPage(rows, number, self, has_next)
+
+
+class LimitPageNumberPagination(CountStrategyMixin, PageNumberPagination):
     page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.exact_count = self.is_exact_count(request)
+        self.cacheable_count = self.is_count_cacheable(view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = CountStrategyPaginator(object_list, per_page)
+        paginator.exact = self.exact_count
+        paginator.cacheable = self.cacheable_count
+        return paginator
+
+
+class LimitOffsetCountPagination(CountStrategyMixin, LimitOffsetPagination):
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.exact_count = self.is_exact_count(request)
+        self.offset = self.get_offset(request)
+        self.request = request
+        results = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        results = results[:self.limit]
+        if self.has_next or (self.offset and not results):
+            self.count = correct_count(
+                get_count(
+                    queryset,
+                    exact=self.exact_count,
+                    cacheable=self.is_count_cacheable(view)
+                ),
+                self.offset,
+                len(results),
+                self.has_next
+            )
+        else:
+            self.count = self.offset + len(results)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return results
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return super().get_next_link()
+
+
+class RecipeFeedPagination(LimitPageNumberPagination):
+    """Пагинация ленты рецептов с опциональным режимом курсора.
+
+    При наличии параметра ``cursor`` страница выбирается по ключу
+    ``(pub_date, id)`` без OFFSET и без подсчёта общего количества,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def is_cursor_mode(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.is_cursor_mode(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        queryset = queryset.order_by(*self.cursor_ordering)
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+            )
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        if isinstance(last, dict):
+            position = last['pub_date'], last['id']
+        else:
+            position = last.pub_date, last.id
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(*position)
+        )
+
+    @staticmethod
+    def encode_cursor(pub_date, pk):
+        return base64.urlsafe_b64encode(
+            f'{pub_date.isoformat()}|{pk}'.encode()
+        ).decode()
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = base64.urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            return datetime.fromisoformat(pub_date), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class RecipeCursorPagination(RecipeFeedPagination):
+    """Пагинация только курсором, начиная с первой страницы."""
+
+    def is_cursor_mode(self, request):
+        return True
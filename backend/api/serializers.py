@@ -1,17 +1,32 @@
 from django.db import transaction
 from django.urls import reverse
 from djoser.serializers import UserSerializer as DjoserUserSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from .fields import (
+    BulkListSerializer,
+    BulkPrimaryKeyRelatedField,
+    IngestImageField
+)
 from .validators import validate_ingredients, validate_tags
+import core.constants as cnsts
+from core.images import schedule_avatar, schedule_recipe_image
 from core.serializers import (
     BaseFavoriteShoppingCartSerializer,
+    CreateOnConflictMixin,
+    ImageVariantsField,
     ShortRecipeSerializer
 )
+from core.shopping_cart import apply_recipe_amounts_change
 from core.short_links import encode_id
+from core.subscriptions import (
+    get_recipes_limit,
+    get_subscribed_author_ids,
+    get_top_recipes
+)
 from recipes.models import (
     Favorite,
+    ImageStatus,
     Ingredient,
     IngredientInRecipe,
     Recipe,
@@ -46,38 +61,59 @@ class UserSerializer(DjoserUserSerializer):
         request = self.context['request']
         return (
             request.user.is_authenticated
-            and obj.subscriptions_on_author.filter(user=request.user).exists()
+            and obj.id in get_subscribed_author_ids(request)
         )
 
 
 class UserAvatarUploadSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField(required=True)
+    avatar = IngestImageField(required=True)
 
     class Meta:
         model = User
         fields = ('avatar',)
 
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        schedule_avatar(instance)
+        return instance
+
+
+class RecipeImageUploadSerializer(serializers.ModelSerializer):
+    """Сериализатор для замены фото рецепта."""
+
+    image = IngestImageField(required=True)
 
-class FollowCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Recipe
+        fields = ('image', 'image_status')
+        read_only_fields = ('image_status',)
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        instance.image_status = ImageStatus.PROCESSING
+        instance = super().update(instance, validated_data)
+        schedule_recipe_image(instance)
+        return instance
+
+
+class FollowCreateSerializer(
+    CreateOnConflictMixin, serializers.ModelSerializer
+):
     """Сериализатор для создания подписки."""
 
+    conflict_message = 'Вы уже подписаны на этого пользователя.'
+
     class Meta:
         model = Follow
         fields = ('user', 'author')
-        validators = (
-            serializers.UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=('user', 'author'),
-                message='Вы уже подписаны на этого пользователя.'
-            ),
-        )
+        read_only_fields = fields
 
-    def validate(self, data):
-        if data['user'] == data['author']:
+    def create(self, validated_data):
+        if validated_data['user'] == validated_data['author']:
             raise serializers.ValidationError(
                 {'errors': 'Нельзя подписаться на самого себя.'}
             )
-        return data
+        return super().create(validated_data)
 
     def to_representation(self, instance):
         request = self.context.get('request')
@@ -101,15 +137,11 @@ class FollowReadSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()
-
-        try:
-            recipes = recipes[:int(
-                self.context.get('request').query_params.get('recipes_limit')
-            )]
-        except (TypeError, ValueError):
-            pass
-
+        recipes = getattr(obj, 'top_recipes', None)
+        if recipes is None:
+            recipes = get_top_recipes(
+                (obj.id,), get_recipes_limit(self.context.get('request'))
+            )
         return ShortRecipeSerializer(
             recipes, many=True, context=self.context
         ).data
@@ -151,7 +183,7 @@ class IngredientInRecipeReadSerializer(serializers.ModelSerializer):
 class IngredientInRecipeWriteSerializer(serializers.ModelSerializer):
     """Сериализатор ингредиента в рецепте (только для записи)."""
 
-    id = serializers.PrimaryKeyRelatedField(
+    id = BulkPrimaryKeyRelatedField(
         queryset=Ingredient.objects.all()
     )
     amount = serializers.IntegerField(
@@ -164,17 +196,19 @@ class IngredientInRecipeWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = IngredientInRecipe
         fields = ('id', 'amount')
+        list_serializer_class = BulkListSerializer
+        bulk_field = 'id'
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для создания и редактирования рецепта."""
 
     ingredients = IngredientInRecipeWriteSerializer(many=True, required=False)
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
-    image = Base64ImageField()
+    image = IngestImageField()
 
     class Meta:
         model = Recipe
@@ -204,30 +238,69 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             for ingredient_data in ingredients_data
         ])
 
+    def update_ingredients(self, recipe, ingredients_data):
+        """Синхронизирует ингредиенты рецепта, не трогая неизменные строки."""
+        existing = {
+            item.ingredient_id: item
+            for item in recipe.ingredientinrecipe_set.all()
+        }
+        old_amounts = {
+            ingredient_id: item.amount
+            for ingredient_id, item in existing.items()
+        }
+        new_amounts = {
+            ingredient_data['id'].id: ingredient_data['amount']
+            for ingredient_data in ingredients_data
+        }
+        removed = [
+            item.pk for ingredient_id, item in existing.items()
+            if ingredient_id not in new_amounts
+        ]
+        changed = []
+        for ingredient_id, item in existing.items():
+            amount = new_amounts.get(ingredient_id)
+            if amount is not None and amount != item.amount:
+                item.amount = amount
+                changed.append(item)
+        if removed:
+            IngredientInRecipe.objects.filter(pk__in=removed).delete()
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ('amount',))
+        self.create_ingredients(recipe, [
+            ingredient_data for ingredient_data in ingredients_data
+            if ingredient_data['id'].id not in existing
+        ])
+        apply_recipe_amounts_change(recipe.id, old_amounts, new_amounts)
+
     @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(
             author=self.context['request'].user,
+            image_status=ImageStatus.PROCESSING,
             **validated_data
         )
         recipe.tags.set(tags)
         self.create_ingredients(recipe, ingredients)
+        schedule_recipe_image(recipe)
         return recipe
 
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
+        if 'image' in validated_data:
+            instance.image_status = ImageStatus.PROCESSING
         instance = super().update(instance, validated_data)
+        if 'image' in validated_data:
+            schedule_recipe_image(instance)
 
         if tags is not None:
             instance.tags.set(tags)
 
         if ingredients is not None:
-            instance.ingredients.clear()
-            self.create_ingredients(instance, ingredients)
+            self.update_ingredients(instance, ingredients)
 
         return instance
 
@@ -248,16 +321,19 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = serializers.ImageField()
+    image_variants = ImageVariantsField(source='image')
 
     class Meta:
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients',
-            'is_favorited', 'is_in_shopping_cart',
-            'name', 'image', 'text', 'cooking_time'
+            'is_favorited', 'is_in_shopping_cart', 'name',
+            'image', 'image_variants', 'image_status', 'text', 'cooking_time'
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context['request']
         return (
             request
@@ -266,6 +342,8 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context['request']
         return (
             request
@@ -292,12 +370,26 @@ class ShortRecipeLinkSerializer(serializers.Serializer):
         }
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    """Сериализатор списка id рецептов для пакетных операций."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=cnsts.MAX_BULK_RECIPES
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
+
+
 class FavoriteSerializer(BaseFavoriteShoppingCartSerializer):
     """Сериализатор избранного."""
 
     class Meta:
         model = Favorite
         fields = '__all__'
+        read_only_fields = ('user', 'recipe')
 
 
 class ShoppingCartSerializer(BaseFavoriteShoppingCartSerializer):
@@ -306,3 +398,4 @@ class ShoppingCartSerializer(BaseFavoriteShoppingCartSerializer):
     class Meta:
         model = ShoppingCart
         fields = '__all__'
+        read_only_fields = ('user', 'recipe')
@@ -0,0 +1,156 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate
+)
+
+from .serializers import RecipeReadSerializer
+from .views import RecipeViewSet
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from users.models import Follow, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_png(color):
+    buffer = BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_WORKERS=0)
+class RecipeCardRendererTests(TestCase):
+    """Ответы из карточек совпадают с RecipeReadSerializer байт в байт."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com',
+            first_name='Иван', last_name='Петров'
+        )
+        self.follower = User.objects.create_user(
+            username='follower', email='follower@example.com',
+            first_name='Анна', last_name='Смирнова'
+        )
+        Follow.objects.create(user=self.follower, author=self.author)
+        tags = [
+            Tag.objects.create(name=f'Тег {i}', slug=f'tag{i}')
+            for i in range(2)
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('мука', 'сахар')
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author_client.put(
+                '/api/users/me/avatar/',
+                {'avatar': 'data:image/png;base64,' + base64.b64encode(
+                    make_png('blue')
+                ).decode()},
+                format='json'
+            )
+            for i, color in enumerate(('red', 'green', 'red')):
+                recipe = Recipe.objects.create(
+                    author=self.author,
+                    name=f'Рецепт {i}',
+                    text='Описание',
+                    cooking_time=10 + i,
+                    image=ContentFile(make_png(color), name=f'{i}.png')
+                )
+                recipe.tags.set(tags[:i + 1])
+                IngredientInRecipe.objects.create(
+                    recipe=recipe, ingredient=ingredients[i % 2], amount=i + 1
+                )
+            call_command('build_image_variants', stdout=StringIO())
+        self.follower_client.post(
+            f'/api/recipes/{recipe.id}/favorite/'
+        )
+        self.follower_client.post(
+            f'/api/recipes/{recipe.id}/shopping_cart/'
+        )
+
+    @property
+    def author_client(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        return client
+
+    @property
+    def follower_client(self):
+        client = APIClient()
+        client.force_authenticate(self.follower)
+        return client
+
+    def get_clients(self):
+        return (
+            (None, APIClient()),
+            (self.author, self.author_client),
+            (self.follower, self.follower_client),
+        )
+
+    def render_expected(self, user, recipe_ids):
+        request = APIRequestFactory().get('/api/recipes/')
+        if user:
+            force_authenticate(request, user)
+        request = Request(
+            request, authenticators=RecipeViewSet().get_authenticators()
+        )
+        recipes = RecipeViewSet.queryset.with_viewer_flags(
+            request.user
+        ).in_bulk(recipe_ids)
+        return [
+            RecipeReadSerializer(
+                recipes[recipe_id], context={'request': request}
+            ).data
+            for recipe_id in recipe_ids
+        ]
+
+    def assert_same_bytes(self, user, data):
+        recipe_ids = [recipe['id'] for recipe in data]
+        self.assertTrue(recipe_ids)
+        self.assertEqual(
+            JSONRenderer().render(data),
+            JSONRenderer().render(self.render_expected(user, recipe_ids))
+        )
+
+    def test_variants_and_avatar_present(self):
+        data = APIClient().get('/api/recipes/').data['results']
+        self.assertTrue(all(recipe['image_variants'] for recipe in data))
+        self.assertTrue(data[0]['author']['avatar'])
+
+    def test_list(self):
+        for user, client in self.get_clients():
+            with self.subTest(user=user):
+                response = client.get('/api/recipes/')
+                self.assertEqual(response.status_code, 200)
+                self.assert_same_bytes(user, response.data['results'])
+
+    def test_detail(self):
+        for user, client in self.get_clients():
+            for recipe_id in Recipe.objects.values_list('id', flat=True):
+                with self.subTest(user=user, recipe=recipe_id):
+                    response = client.get(f'/api/recipes/{recipe_id}/')
+                    self.assertEqual(response.status_code, 200)
+                    self.assert_same_bytes(user, [response.data])
+
+    def test_feed(self):
+        response = self.follower_client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 200)
+        self.assert_same_bytes(self.follower, response.data['results'])
@@ -1,22 +1,30 @@
-from io import BytesIO
-
-from django.db.models import Count, F, Prefetch, Sum
-from django.http import FileResponse
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from djoser.conf import settings as djoser_settings
 from djoser.views import UserViewSet as DjoserUserViewSet
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from .cards import RecipeCardRenderer, get_card_queryset_values
 from .filters import RecipeFilter
+from .pagination import (
+    LimitOffsetCountPagination,
+    RecipeCursorPagination,
+    RecipeFeedPagination
+)
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
     FavoriteSerializer,
     FollowCreateSerializer,
     FollowReadSerializer,
     IngredientSerializer,
+    RecipeIdsSerializer,
+    RecipeImageUploadSerializer,
     RecipeWriteSerializer,
     ShoppingCartSerializer,
     ShortRecipeLinkSerializer,
@@ -24,21 +32,39 @@ from .serializers import (
     UserAvatarUploadSerializer,
     UserSerializer
 )
-from core.shopping_cart import generate_shopping_list_text
+from core.catalogs import CatalogSnapshot, CatalogSnapshotMixin
+from core.response_cache import cached_anonymous_response
+from core.feed import get_feed_filter
+from core.search import PrefixIndex, TrigramIndex
+from core.shopping_cart import SHOPPING_LIST_FORMATS
+from core.subscriptions import attach_top_recipes, get_recipes_limit
+from core.user_recipes import add_user_recipes, remove_user_recipes
 from recipes.models import (
     Favorite,
     Ingredient,
     IngredientInRecipe,
     Recipe,
     ShoppingCart,
+    ShoppingListItem,
     Tag
 )
+from recipes.signals import (
+    user_recipes_bulk_created,
+    user_recipes_bulk_deleted
+)
 from users.models import Follow, User
 
 
 class UserViewSet(DjoserUserViewSet):
     queryset = User.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetCountPagination
+
+    def has_viewer_scoped_queryset(self):
+        return self.action == 'subscriptions' or (
+            self.action == 'list'
+            and djoser_settings.HIDE_USERS
+            and not self.request.user.is_staff
+        )
 
     @action(
         detail=False,
@@ -79,7 +105,8 @@ class UserViewSet(DjoserUserViewSet):
     def delete_avatar(self, request):
         """Метод для удаления аватара текущего пользователя."""
         user = request.user
-        user.avatar.delete(save=True)
+        user.avatar = None
+        user.save(update_fields=('avatar',))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -91,7 +118,8 @@ class UserViewSet(DjoserUserViewSet):
         """Метод для просмотра всех подписок пользователя."""
         page = self.paginate_queryset(User.objects.filter(
             subscriptions_on_author__user=request.user
-        ).annotate(recipes_count=Count('recipes')).order_by('username'))
+        ).order_by('username'))
+        attach_top_recipes(page, get_recipes_limit(request))
         serializer = FollowReadSerializer(
             page, many=True, context={'request': request}
         )
@@ -106,11 +134,10 @@ class UserViewSet(DjoserUserViewSet):
         """Метод для создания подписки на автора."""
         author = get_object_or_404(User, id=id)
         serializer = FollowCreateSerializer(
-            data={'author': author.id, 'user': request.user.id},
-            context={'request': request}
+            data={}, context={'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(user=request.user, author=author)
 
         return Response(
             serializer.data,
@@ -135,22 +162,40 @@ class UserViewSet(DjoserUserViewSet):
         )
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogSnapshotMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для чтения информации о тегах."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+    catalog = CatalogSnapshot('tags', Tag.objects.all, TagSerializer)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogSnapshotMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для чтения информации об ингредиентах."""
 
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('^name',)
     pagination_class = None
+    catalog = CatalogSnapshot(
+        'ingredients', Ingredient.objects.all, IngredientSerializer,
+        indexes={'prefix': PrefixIndex, 'trigram': TrigramIndex}
+    )
+
+    def get_catalog_rows(self, request, snapshot):
+        name = request.query_params.get(api_settings.SEARCH_PARAM)
+        if not name:
+            return snapshot.rows
+        try:
+            limit = int(request.query_params.get('limit'))
+        except (TypeError, ValueError):
+            limit = None
+        if request.query_params.get('fuzzy') in ('1', 'true', 'True'):
+            return snapshot.indexes['trigram'].search(name, limit)
+        return (
+            snapshot.indexes['prefix'].search(name, limit)
+            or snapshot.indexes['trigram'].search(name, limit)
+        )
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -168,19 +213,61 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeWriteSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    pagination_class = RecipeFeedPagination
     permission_classes = (IsAuthorOrReadOnly,)
 
+    def get_queryset(self):
+        return super().get_queryset().with_viewer_flags(self.request.user)
+
+    def has_viewer_scoped_queryset(self):
+        return self.request.user.is_authenticated and any(
+            name in self.request.query_params
+            for name in RecipeFilter.viewer_scoped_filters
+        )
+
+    def get_card_queryset(self):
+        return Recipe.objects.with_viewer_flags(self.request.user)
+
+    def get_cards_response(self, queryset, paginator):
+        page = paginator.paginate_queryset(
+            get_card_queryset_values(queryset), self.request, view=self
+        )
+        return paginator.get_paginated_response(
+            RecipeCardRenderer(self.request).render_rows(page)
+        )
+
+    @cached_anonymous_response
+    def list(self, request, *args, **kwargs):
+        return self.get_cards_response(
+            self.filter_queryset(self.get_card_queryset()), self.paginator
+        )
+
+    @cached_anonymous_response
+    def retrieve(self, request, *args, **kwargs):
+        """Метод для чтения рецепта из его карточки.
+
+        Для чтения объектные права не требуют полей рецепта, поэтому
+        проверяются на строке карточки.
+        """
+        row = get_object_or_404(
+            get_card_queryset_values(
+                self.filter_queryset(self.get_card_queryset())
+            ),
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field]
+        )
+        self.check_object_permissions(request, row)
+        data = RecipeCardRenderer(request).render_rows((row,))
+        if not data:
+            raise Http404
+        return Response(data[0])
+
     def _create_relation(self, serializer_class, pk):
         recipe = get_object_or_404(Recipe, id=pk)
-        data = {
-            'user': self.request.user.id,
-            'recipe': recipe.id
-        }
         serializer = serializer_class(
-            data=data, context={'request': self.request}
+            data={}, context={'request': self.request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(user=self.request.user, recipe=recipe)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def _delete_relation(self, model, pk):
@@ -195,6 +282,57 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    def _get_bulk_recipe_ids(self):
+        serializer = RecipeIdsSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['recipes']
+
+    @transaction.atomic
+    def _bulk_create_relations(self, model):
+        recipe_ids = self._get_bulk_recipe_ids()
+        found_ids = set(Recipe.objects.filter(
+            id__in=recipe_ids
+        ).values_list('id', flat=True))
+        created_ids = add_user_recipes(
+            model,
+            self.request.user,
+            [recipe_id for recipe_id in recipe_ids if recipe_id in found_ids]
+        )
+        if created_ids:
+            user_recipes_bulk_created.send(
+                sender=model, user=self.request.user, recipe_ids=created_ids
+            )
+        created_ids = set(created_ids)
+        return Response({'results': [
+            {
+                'id': recipe_id,
+                'status': (
+                    'not_found' if recipe_id not in found_ids
+                    else 'created' if recipe_id in created_ids else 'exists'
+                )
+            }
+            for recipe_id in recipe_ids
+        ]})
+
+    @transaction.atomic
+    def _bulk_delete_relations(self, model):
+        recipe_ids = self._get_bulk_recipe_ids()
+        deleted_ids = remove_user_recipes(
+            model, self.request.user, recipe_ids
+        )
+        if deleted_ids:
+            user_recipes_bulk_deleted.send(
+                sender=model, user=self.request.user, recipe_ids=deleted_ids
+            )
+        deleted_ids = set(deleted_ids)
+        return Response({'results': [
+            {
+                'id': recipe_id,
+                'status': 'deleted' if recipe_id in deleted_ids else 'absent'
+            }
+            for recipe_id in recipe_ids
+        ]})
+
     @action(
         detail=True,
         methods=('post',),
@@ -223,6 +361,62 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Метод для удаления рецепта из списка покупок."""
         return self._delete_relation(ShoppingCart, pk)
 
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='favorite/bulk'
+    )
+    def bulk_favorite(self, request):
+        """Метод для добавления нескольких рецептов в избранное."""
+        return self._bulk_create_relations(Favorite)
+
+    @bulk_favorite.mapping.delete
+    def bulk_unfavorite(self, request):
+        """Метод для удаления нескольких рецептов из избранного."""
+        return self._bulk_delete_relations(Favorite)
+
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='shopping_cart/bulk'
+    )
+    def bulk_shopping_cart(self, request):
+        """Метод для добавления нескольких рецептов в список покупок."""
+        return self._bulk_create_relations(ShoppingCart)
+
+    @bulk_shopping_cart.mapping.delete
+    def bulk_remove_shopping_cart(self, request):
+        """Метод для удаления нескольких рецептов из списка покупок."""
+        return self._bulk_delete_relations(ShoppingCart)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def feed(self, request):
+        """Метод для ленты рецептов авторов из подписок пользователя."""
+        return self.get_cards_response(
+            self.filter_queryset(self.get_card_queryset().filter(
+                get_feed_filter(request.user)
+            )),
+            RecipeCursorPagination()
+        )
+
+    @action(detail=True, methods=('put',), url_path='image')
+    def image(self, request, pk=None):
+        """Метод для замены фото рецепта, в том числе multipart-файлом."""
+        serializer = RecipeImageUploadSerializer(
+            self.get_object(),
+            data=request.data,
+            context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
     @action(detail=True, methods=('get',), url_path='get-link')
     def short_link(self, request, pk=None):
         """Метод для получения короткой ссылки на рецепт."""
@@ -240,22 +434,26 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def download_shopping_cart(self, request):
         """Метод для скачивания списка покупок."""
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__in_shoppingcarts__user=request.user
+        file_format = request.query_params.get('file_format', 'txt')
+        export_format = SHOPPING_LIST_FORMATS.get(file_format)
+        if export_format is None:
+            return Response(
+                {'file_format': 'Неподдерживаемый формат списка покупок.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ingredients = ShoppingListItem.objects.filter(
+            user=request.user
         ).values(
+            'total_amount',
             name=F('ingredient__name'),
             unit=F('ingredient__measurement_unit')
-        ).annotate(total_amount=Sum('amount')).order_by('name')
-
-        content = generate_shopping_list_text(ingredients)
-        buffer = BytesIO()
-        buffer.write(content.encode('utf-8'))
-        buffer.seek(0)
-        response = FileResponse(
-            buffer,
-            content_type='text/plain; charset=utf-8'
+        ).order_by('name').iterator()
+
+        response = StreamingHttpResponse(
+            export_format.stream(ingredients),
+            content_type=export_format.content_type
         )
         response[
             'Content-Disposition'
-        ] = 'attachment; filename="shopping_list.txt"'
+        ] = f'attachment; filename="shopping_list.{file_format}"'
         return response
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+import core.constants as cnsts
+
+logger = logging.getLogger(__name__)
+
+Snapshot = namedtuple(
+    'Snapshot',
+    ('rows', 'by_id', 'indexes', 'version', 'etag', 'generation', 'built_at')
+)
+
+CATALOGS = []
+
+
+def get_catalog_generation_key(name):
+    return f'catalog:{name}:generation'
+
+
+def invalidate_catalog(name):
+    """Функция пометки снимка справочника как устаревшего во всех процессах."""
+    cache.set(get_catalog_generation_key(name), time.time_ns(), None)
+
+
+class CatalogSnapshot:
+    """Снимок справочника в памяти процесса.
+
+    Версия снимка — хэш его содержимого, поэтому ETag не меняется, пока
+    не изменились сами данные. Снимок пересобирается после
+    ``invalidate_catalog`` или по истечении ``CATALOG_SNAPSHOT_TIMEOUT``.
+    """
+
+    def __init__(self, name, get_queryset, serializer_class, indexes=None):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.serializer_class = serializer_class
+        self.indexes = indexes or {}
+        self._snapshot = None
+        self._lock = threading.Lock()
+        CATALOGS.append(self)
+
+    def is_fresh(self, snapshot, generation):
+        return (
+            snapshot is not None
+            and snapshot.generation == generation
+            and time.monotonic() - snapshot.built_at
+            < cnsts.CATALOG_SNAPSHOT_TIMEOUT
+        )
+
+    def get(self):
+        generation = cache.get(get_catalog_generation_key(self.name))
+        snapshot = self._snapshot
+        if self.is_fresh(snapshot, generation):
+            return snapshot
+        with self._lock:
+            if not self.is_fresh(self._snapshot, generation):
+                self._snapshot = self.build(generation)
+            return self._snapshot
+
+    def build(self, generation):
+        rows = [
+            dict(row) for row in
+            self.serializer_class(self.get_queryset(), many=True).data
+        ]
+        version = hashlib.sha1(json.dumps(
+            rows, ensure_ascii=False, sort_keys=True
+        ).encode()).hexdigest()
+        return Snapshot(
+            rows=rows,
+            by_id={str(row['id']): row for row in rows},
+            indexes={
+                name: index_class(rows)
+                for name, index_class in self.indexes.items()
+            },
+            version=version,
+            etag=f'"{version}"',
+            generation=generation,
+            built_at=time.monotonic(),
+        )
+
+
+def warm_catalogs():
+    """Функция построения снимков справочников при старте процесса."""
+    import_module(settings.ROOT_URLCONF)
+    for catalog in CATALOGS:
+        try:
+            catalog.get()
+        except DatabaseError:
+            logger.warning('Не удалось построить снимок %s.', catalog.name)
+
+
+class CatalogSnapshotMixin:
+    """Отдаёт list и retrieve справочника из снимка с поддержкой ETag."""
+
+    catalog = None
+
+    def get_catalog_rows(self, request, snapshot):
+        return snapshot.rows
+
+    def get_snapshot_response(self, request, data, etag):
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        snapshot = self.catalog.get()
+        return self.get_snapshot_response(
+            request, self.get_catalog_rows(request, snapshot), snapshot.etag
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = self.catalog.get()
+        row = snapshot.by_id.get(str(kwargs[self.lookup_field]))
+        if row is None:
+            raise Http404
+        return self.get_snapshot_response(
+            request, row, f'"{snapshot.version}-{row["id"]}"'
+        )
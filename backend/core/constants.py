@@ -17,3 +17,53 @@ MAX_TIME_QUANTITY = 32767
 MAX_MEASUREMENT_UNIT_LENGTH = 64
 
 SHORT_COOKING_TIME = 30
+
+COUNT_CACHE_TIMEOUT = 60
+
+COUNT_ESTIMATE_THRESHOLD = 100000
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+CATALOG_SNAPSHOT_TIMEOUT = 600
+
+FUZZY_SEARCH_LIMIT = 10
+
+FUZZY_SEARCH_THRESHOLD = 0.3
+
+FUZZY_SEARCH_BUDGET = 0.005
+
+MAX_BULK_RECIPES = 100
+
+MAX_IMAGE_SIDE = 2048
+
+IMAGE_JPEG_QUALITY = 90
+
+MAX_IMAGE_STATUS_LENGTH = 16
+
+IMAGE_VARIANTS = (('card', 360), ('detail', 1080))
+
+IMAGE_VARIANT_FORMATS = (('webp', 'WEBP'), ('jpeg', 'JPEG'))
+
+IMAGE_VARIANTS_DIR = 'variants'
+
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024
+
+MAX_IMAGE_PIXELS = 40_000_000
+
+BASE64_CHUNK_SIZE = 64 * 1024
+
+MEDIA_GC_MIN_AGE = 60 * 60
+
+SHORT_LINK_SIGNATURE_LENGTH = 3
+
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+
+RECIPE_IDS_REFRESH_INTERVAL = 1
+
+FEED_TIMELINE_SIZE = 500
+
+FEED_FANOUT_LIMIT = 1000
+
+FEED_BATCH_SIZE = 500
+
+RECIPE_CARDS_BATCH_SIZE = 500
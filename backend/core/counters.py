@@ -0,0 +1,49 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe
+from users.models import Follow, User
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Follow, 'author'),
+)
+
+
+def shift_counter(model, pk, field, delta):
+    """Функция атомарного изменения счётчика на delta."""
+    shift_counters(model, (pk,), field, delta)
+
+
+def shift_counters(model, pks, field, delta):
+    model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def get_actual_count(related_model, related_field):
+    return Coalesce(Subquery(
+        related_model.objects.filter(
+            **{related_field: OuterRef('pk')}
+        ).order_by().values(related_field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def reconcile_counters(batch_size=1000):
+    """Функция исправления расхождений счётчиков с фактическими данными.
+
+    Возвращает словарь с числом исправленных строк по каждому счётчику.
+    """
+    fixed = {}
+    for model, field, related_model, related_field in COUNTERS:
+        drifted = model.objects.annotate(
+            actual_count=get_actual_count(related_model, related_field)
+        ).exclude(**{field: F('actual_count')}).order_by()
+        objs = []
+        for obj in drifted.only('pk', field).iterator():
+            setattr(obj, field, obj.actual_count)
+            objs.append(obj)
+        model.objects.bulk_update(objs, (field,), batch_size=batch_size)
+        fixed[f'{model.__name__}.{field}'] = len(objs)
+    return fixed
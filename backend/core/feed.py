@@ -0,0 +1,99 @@
+from itertools import islice
+
+from django.db.models import F, Q, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+import core.constants as cnsts
+from recipes.models import FeedEntry, Recipe
+from users.models import Follow
+
+FEED_ORDERING = (F('pub_date').desc(), F('recipe_id').desc())
+
+
+def is_fanout_author(subscribers_count):
+    """Функция проверки, раздаются ли рецепты автора по лентам.
+
+    Рецепты авторов с большим числом подписчиков не копируются в ленты,
+    а подмешиваются при чтении.
+    """
+    return subscribers_count <= cnsts.FEED_FANOUT_LIMIT
+
+
+def trim_feeds(user_ids):
+    """Функция удаления записей за пределами FEED_TIMELINE_SIZE."""
+    ranked = FeedEntry.objects.filter(user_id__in=user_ids).annotate(
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=F('user_id'),
+            order_by=FEED_ORDERING
+        )
+    ).values('id', 'row_number').order_by()
+    sql, params = ranked.query.sql_with_params()
+    FeedEntry.objects.filter(id__in=RawSQL(
+        f'SELECT ranked.id FROM ({sql}) ranked '
+        'WHERE ranked.row_number > %s',
+        (*params, cnsts.FEED_TIMELINE_SIZE)
+    )).delete()
+
+
+def fan_out_recipe(recipe):
+    """Функция добавления нового рецепта в ленты подписчиков автора."""
+    if not is_fanout_author(recipe.author.subscribers_count):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=recipe.author_id
+    ).values_list('user_id', flat=True).iterator()
+    while True:
+        batch = list(islice(follower_ids, cnsts.FEED_BATCH_SIZE))
+        if not batch:
+            break
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id, recipe=recipe, pub_date=recipe.pub_date
+                )
+                for user_id in batch
+            ),
+            ignore_conflicts=True
+        )
+        trim_feeds(batch)
+
+
+def add_author_to_feed(user_id, author):
+    """Функция заполнения ленты последними рецептами нового автора."""
+    if not is_fanout_author(author.subscribers_count):
+        return
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(user_id=user_id, recipe_id=recipe_id, pub_date=pub_date)
+            for recipe_id, pub_date in Recipe.objects.filter(
+                author=author
+            ).order_by('-pub_date', '-id').values_list(
+                'id', 'pub_date'
+            )[:cnsts.FEED_TIMELINE_SIZE]
+        ),
+        ignore_conflicts=True
+    )
+    trim_feeds((user_id,))
+
+
+def remove_author_from_feed(user_id, author_id):
+    """Функция удаления рецептов автора из ленты после отписки."""
+    FeedEntry.objects.filter(
+        user_id=user_id, recipe__author_id=author_id
+    ).delete()
+
+
+def get_feed_filter(user):
+    """Функция условия отбора рецептов ленты подписок пользователя.
+
+    Объединяет записи ленты пользователя и рецепты авторов без раздачи,
+    на которых он подписан.
+    """
+    return Q(id__in=FeedEntry.objects.filter(
+        user=user
+    ).values('recipe_id')) | Q(author_id__in=Follow.objects.filter(
+        user=user,
+        author__subscribers_count__gt=cnsts.FEED_FANOUT_LIMIT
+    ).values('author_id'))
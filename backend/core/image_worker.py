@@ -0,0 +1,190 @@
+"""Обработка изображений в процессах пула.
+
+Модуль не импортирует Django: он загружается в дочерних процессах,
+запущенных через spawn, и работает только с файлами на диске.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import warnings
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+import core.constants as cnsts
+
+NORMALIZED_FORMATS = ('JPEG', 'PNG', 'WEBP')
+
+IMAGE_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+HASHED_NAME_RE = re.compile(r'[0-9a-f]{64}')
+
+Image.MAX_IMAGE_PIXELS = cnsts.MAX_IMAGE_PIXELS
+
+
+def read_image_header(file):
+    """Функция чтения формата и размеров изображения по заголовку.
+
+    Пиксели не декодируются. Возвращает ``None`` для неподдерживаемых
+    форматов, повреждённых заголовков и «бомб» с числом пикселей
+    больше ``MAX_IMAGE_PIXELS``.
+    """
+    position = file.tell()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            with Image.open(file) as image:
+                image_format, (width, height) = image.format, image.size
+    except (
+        OSError, Image.DecompressionBombError, Image.DecompressionBombWarning
+    ):
+        return None
+    finally:
+        file.seek(position)
+    if (
+        image_format not in IMAGE_EXTENSIONS
+        or not 0 < width * height <= cnsts.MAX_IMAGE_PIXELS
+    ):
+        return None
+    return image_format, width, height
+
+
+def is_normalized(path, data):
+    """Функция проверки, что файл уже пересохранён нормализацией.
+
+    Имя файла в хранилище — SHA-256 загруженного содержимого, поэтому
+    несовпадение хэша означает, что файл уже обработан. Повторная
+    загрузка того же файла не пережимает его снова.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (
+        HASHED_NAME_RE.fullmatch(stem) is not None
+        and hashlib.sha256(data).hexdigest() != stem
+    )
+
+
+def save_image(image, path, **params):
+    """Функция атомарной записи изображения через временный файл.
+
+    Временное имя уникально, поэтому параллельные задачи над одним
+    файлом не мешают друг другу.
+    """
+    descriptor, temp_path = tempfile.mkstemp(
+        suffix='.tmp', dir=os.path.dirname(path)
+    )
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            image.save(file, **params)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def normalize_image(path):
+    """Функция проверки и нормализации изображения на месте.
+
+    Поворачивает снимок по EXIF, уменьшает до ``MAX_IMAGE_SIDE``
+    и пересохраняет без метаданных. Возвращает итоговые размеры.
+    Проверка и нормализация выполняются над одними и теми же
+    прочитанными байтами.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    with Image.open(BytesIO(data)) as image:
+        image.verify()
+    with Image.open(BytesIO(data)) as image:
+        image_format = image.format
+        if (
+            image_format not in NORMALIZED_FORMATS
+            or is_normalized(path, data)
+        ):
+            return image.size
+        normalized = ImageOps.exif_transpose(image)
+        normalized.thumbnail((cnsts.MAX_IMAGE_SIDE, cnsts.MAX_IMAGE_SIDE))
+        if image_format == 'JPEG' and normalized.mode != 'RGB':
+            normalized = normalized.convert('RGB')
+        save_image(
+            normalized,
+            path,
+            format=image_format,
+            quality=cnsts.IMAGE_JPEG_QUALITY,
+            optimize=True
+        )
+        return normalized.size
+
+
+def get_variant_path(path, variant, extension):
+    """Функция построения пути варианта рядом с исходным файлом.
+
+    Подходит и для абсолютных путей, и для имён в хранилище.
+    """
+    head, tail = os.path.split(path)
+    return os.path.join(
+        head,
+        cnsts.IMAGE_VARIANTS_DIR,
+        f'{os.path.splitext(tail)[0]}_{variant}.{extension}'
+    )
+
+
+def get_variant_paths(path):
+    """Функция получения путей всех вариантов в порядке их создания."""
+    return [
+        get_variant_path(path, variant, extension)
+        for variant, _ in cnsts.IMAGE_VARIANTS
+        for extension, _ in cnsts.IMAGE_VARIANT_FORMATS
+    ]
+
+
+def flatten_alpha(image):
+    """Функция наложения прозрачного изображения на белый фон."""
+    if image.mode not in ('RGBA', 'LA', 'P'):
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def generate_variants(path):
+    """Функция создания уменьшенных копий в WebP и JPEG.
+
+    Уже существующие варианты не пересоздаются.
+    """
+    with Image.open(path) as image:
+        image.load()
+        for variant, width in cnsts.IMAGE_VARIANTS:
+            resized = image.copy()
+            if resized.width > width:
+                resized = resized.resize(
+                    (width, max(1, round(image.height * width / image.width))),
+                    Image.LANCZOS
+                )
+            for extension, image_format in cnsts.IMAGE_VARIANT_FORMATS:
+                variant_path = get_variant_path(path, variant, extension)
+                if os.path.exists(variant_path):
+                    continue
+                os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+                output = (
+                    flatten_alpha(resized) if image_format == 'JPEG'
+                    else resized
+                )
+                save_image(
+                    output,
+                    variant_path,
+                    format=image_format,
+                    quality=cnsts.IMAGE_JPEG_QUALITY
+                )
+
+
+def process_recipe_image(path):
+    """Функция нормализации фото рецепта и создания его вариантов.
+
+    Файл с уже созданными вариантами обработан ранее: при дедупликации
+    по содержимому он может достаться нескольким рецептам.
+    """
+    if os.path.exists(get_variant_paths(path)[-1]):
+        return
+    normalize_image(path)
+    generate_variants(path)
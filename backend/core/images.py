@@ -0,0 +1,170 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.dispatch import Signal
+
+import core.constants as cnsts
+from core.image_worker import (
+    get_variant_path,
+    get_variant_paths,
+    normalize_image,
+    process_recipe_image
+)
+from core.response_cache import bump_recipes_generation
+from recipes.models import ImageStatus, Recipe
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Отправляются после фоновой обработки, которая меняет записи через
+# update() без post_save. Аргументы: recipe_id и user_id соответственно.
+recipe_image_processed = Signal()
+avatar_rejected = Signal()
+
+_executor = None
+
+
+def get_executor():
+    """Функция получения пула процессов обработки изображений."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def submit_image_job(job, path, on_done):
+    """Функция запуска обработки файла функцией job в пуле.
+
+    При ``IMAGE_WORKERS = 0`` файл обрабатывается в текущем потоке.
+    ``on_done`` получает ``True``, если изображение прошло проверку.
+    """
+    global _executor
+    if not settings.IMAGE_WORKERS:
+        on_done(run_image_job(job, path))
+        return
+    try:
+        future = get_executor().submit(job, path)
+    except BrokenProcessPool:
+        _executor = None
+        future = get_executor().submit(job, path)
+
+    def callback(future):
+        try:
+            on_done(future.exception() is None)
+        finally:
+            connections.close_all()
+
+    future.add_done_callback(callback)
+
+
+def run_image_job(job, path):
+    """Функция синхронной обработки файла с журналированием ошибок."""
+    try:
+        job(path)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', path)
+        return False
+    return True
+
+
+def schedule_recipe_image(recipe):
+    """Функция постановки фото рецепта в очередь после фиксации."""
+    recipe_id, name, path = recipe.id, recipe.image.name, recipe.image.path
+
+    def on_done(success):
+        Recipe.objects.filter(id=recipe_id, image=name).update(
+            image_status=(
+                ImageStatus.READY if success else ImageStatus.FAILED
+            )
+        )
+        recipe_image_processed.send(sender=Recipe, recipe_id=recipe_id)
+        bump_recipes_generation()
+
+    transaction.on_commit(
+        lambda: submit_image_job(process_recipe_image, path, on_done)
+    )
+
+
+def schedule_avatar(user):
+    """Функция постановки аватара в очередь после фиксации.
+
+    Аватар, не прошедший проверку, отвязывается от пользователя.
+    """
+    user_id, name, path = user.id, user.avatar.name, user.avatar.path
+
+    def on_done(success):
+        if success:
+            return
+        if User.objects.filter(id=user_id, avatar=name).update(avatar=''):
+            avatar_rejected.send(sender=User, user_id=user_id)
+
+    transaction.on_commit(
+        lambda: submit_image_job(normalize_image, path, on_done)
+    )
+
+
+def has_variants(image):
+    """Функция проверки, что все варианты изображения созданы."""
+    return bool(image) and image.storage.exists(
+        get_variant_paths(image.name)[-1]
+    )
+
+
+def get_variant_urls(image):
+    """Функция получения относительных адресов вариантов изображения.
+
+    Возвращает ``None``, пока варианты не созданы.
+    """
+    if not has_variants(image):
+        return None
+    return {
+        variant: {
+            extension: image.storage.url(
+                get_variant_path(image.name, variant, extension)
+            )
+            for extension, _ in cnsts.IMAGE_VARIANT_FORMATS
+        }
+        for variant, _ in cnsts.IMAGE_VARIANTS
+    }
+
+
+def format_image_variants(urls, build_url=None):
+    """Функция построения адресов вариантов и srcset для ответа API.
+
+    ``build_url`` превращает относительный адрес в абсолютный.
+    """
+    if urls is None:
+        return None
+    variants = {
+        variant: {
+            extension: (
+                build_url(urls[variant][extension]) if build_url
+                else urls[variant][extension]
+            )
+            for extension, _ in cnsts.IMAGE_VARIANT_FORMATS
+        }
+        for variant, _ in cnsts.IMAGE_VARIANTS
+    }
+    variants['srcset'] = {
+        extension: ', '.join(
+            f'{variants[variant][extension]} {width}w'
+            for variant, width in cnsts.IMAGE_VARIANTS
+        )
+        for extension, _ in cnsts.IMAGE_VARIANT_FORMATS
+    }
+    return variants
+
+
+def get_image_variants(image, request=None):
+    """Функция получения адресов вариантов и srcset изображения."""
+    return format_image_variants(
+        get_variant_urls(image),
+        request.build_absolute_uri if request else None
+    )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.image_worker import generate_variants
+from core.images import has_variants, run_image_job
+from core.recipe_cards import rebuild_recipe_cards
+from core.response_cache import bump_recipes_generation
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие варианты фото рецептов'
+
+    def handle(self, *args, **options):
+        built_names = set()
+        failed = 0
+        recipes = Recipe.objects.exclude(image='').only('image')
+        for recipe in recipes.iterator():
+            if recipe.image.name in built_names or has_variants(recipe.image):
+                continue
+            if run_image_job(generate_variants, recipe.image.path):
+                built_names.add(recipe.image.name)
+            else:
+                failed += 1
+        if built_names:
+            # Один файл может принадлежать нескольким рецептам.
+            rebuild_recipe_cards(Recipe.objects.filter(
+                image__in=built_names
+            ).values_list('id', flat=True))
+            bump_recipes_generation()
+        self.stdout.write(
+            f'Создано: {len(built_names)}, с ошибкой: {failed}'
+        )
+        self.stdout.write(self.style.SUCCESS('Варианты фото готовы!'))
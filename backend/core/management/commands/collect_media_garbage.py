@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+import core.constants as cnsts
+from core.media import collect_orphans
+
+
+class Command(BaseCommand):
+    help = 'Удаляет медиафайлы, на которые не ссылается ни одна запись'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--min-age', type=int, default=cnsts.MEDIA_GC_MIN_AGE
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        deleted = 0
+        for name in collect_orphans(
+            options['batch_size'], options['min_age'], options['dry_run']
+        ):
+            self.stdout.write(name, self.style.WARNING)
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено неиспользуемых файлов: {deleted}'
+            if not options['dry_run']
+            else f'Найдено неиспользуемых файлов: {deleted}'
+        ))
@@ -5,6 +5,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db.models import ForeignKey
 
+from core.catalogs import invalidate_catalog
 from recipes.models import Ingredient
 
 
@@ -15,6 +16,7 @@ FILE_MODEL_MAP = {
     'ingredients.csv': {
         'model': Ingredient,
         'fields': ('name', 'measurement_unit'),
+        'catalog': 'ingredients',
     },
 }
 
@@ -39,6 +41,7 @@ class Command(BaseCommand):
                     row_data = dict(zip(field_names, row))
                     data.append(model(**self.get_fields(row_data, model)))
                 model.objects.bulk_create(data, ignore_conflicts=True)
+            invalidate_catalog(info['catalog'])
             self.stdout.write(self.style.SUCCESS(
                 f'Импортирован файл: {filename}')
             )
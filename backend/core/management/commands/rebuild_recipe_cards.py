@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.recipe_cards import rebuild_recipe_cards
+from core.response_cache import bump_recipes_generation
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает карточки всех рецептов'
+
+    def handle(self, *args, **options):
+        rebuild_recipe_cards(
+            Recipe.objects.values_list('id', flat=True).iterator()
+        )
+        bump_recipes_generation()
+        self.stdout.write(self.style.SUCCESS('Карточки рецептов пересобраны!'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Сверяет денормализованные счётчики с фактическими данными'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        for counter, fixed in reconcile_counters(
+            options['batch_size']
+        ).items():
+            self.stdout.write(f'{counter}: исправлено {fixed}')
+        self.stdout.write(self.style.SUCCESS('Сверка счётчиков завершена!'))
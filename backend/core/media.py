@@ -0,0 +1,79 @@
+import os
+from datetime import timedelta
+from itertools import islice
+
+from django.utils import timezone
+
+import core.constants as cnsts
+from core.image_worker import get_variant_paths
+from recipes.models import Recipe
+from users.models import User
+
+MEDIA_FIELDS = ((Recipe, 'image'), (User, 'avatar'))
+
+
+def iter_files(storage, directory):
+    """Функция обхода исходных файлов каталога без вариантов."""
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        if name != cnsts.IMAGE_VARIANTS_DIR:
+            yield from iter_files(storage, os.path.join(directory, name))
+
+
+def iter_orphan_variants(storage, directory):
+    """Функция поиска вариантов, исходный файл которых удалён."""
+    directories, files = storage.listdir(directory)
+    if cnsts.IMAGE_VARIANTS_DIR in directories:
+        variants_directory = os.path.join(
+            directory, cnsts.IMAGE_VARIANTS_DIR
+        )
+        stems = {os.path.splitext(name)[0] for name in files}
+        for name in storage.listdir(variants_directory)[1]:
+            if os.path.splitext(name)[0].rsplit('_', 1)[0] not in stems:
+                yield os.path.join(variants_directory, name)
+    for name in directories:
+        if name != cnsts.IMAGE_VARIANTS_DIR:
+            yield from iter_orphan_variants(
+                storage, os.path.join(directory, name)
+            )
+
+
+def collect_orphans(batch_size, min_age=cnsts.MEDIA_GC_MIN_AGE,
+                    dry_run=False):
+    """Функция удаления медиафайлов, на которые не ссылаются записи.
+
+    Файлы проверяются пачками по batch_size одним запросом на пачку.
+    Файлы моложе min_age секунд пропускаются: их запись может быть ещё
+    не зафиксирована. Возвращает имена удалённых файлов.
+    """
+    threshold = timezone.now() - timedelta(seconds=min_age)
+    for model, field_name in MEDIA_FIELDS:
+        field = model._meta.get_field(field_name)
+        storage, directory = field.storage, field.upload_to
+        if not storage.exists(directory):
+            continue
+        files = iter_files(storage, directory)
+        while True:
+            batch = list(islice(files, batch_size))
+            if not batch:
+                break
+            referenced = set(model.objects.filter(
+                **{f'{field_name}__in': batch}
+            ).values_list(field_name, flat=True))
+            for name in batch:
+                if (
+                    name in referenced
+                    or storage.get_modified_time(name) > threshold
+                ):
+                    continue
+                if not dry_run:
+                    storage.delete(name)
+                    for variant in get_variant_paths(name):
+                        storage.delete(variant)
+                yield name
+        for name in list(iter_orphan_variants(storage, directory)):
+            if not dry_run:
+                storage.delete(name)
+            yield name
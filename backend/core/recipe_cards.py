@@ -0,0 +1,98 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+import core.constants as cnsts
+from core.images import get_variant_urls
+from core.response_cache import bump_recipes_generation
+from recipes.models import IngredientInRecipe, Recipe, RecipeCard
+
+
+def get_file_url(file):
+    """Функция получения относительного адреса файла или None."""
+    return file.url if file else None
+
+
+def build_recipe_card(recipe):
+    """Функция сборки не зависящей от зрителя части ответа о рецепте.
+
+    Адреса файлов хранятся относительными: абсолютными их делает
+    представление, которому известен хост запроса.
+    """
+    author = recipe.author
+    return {
+        'id': recipe.id,
+        'tags': [
+            {'id': tag.id, 'name': tag.name, 'slug': tag.slug}
+            for tag in recipe.tags.all()
+        ],
+        'author': {
+            'email': author.email,
+            'id': author.id,
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+            'avatar': get_file_url(author.avatar),
+        },
+        'ingredients': [
+            {
+                'id': item.ingredient.id,
+                'name': item.ingredient.name,
+                'measurement_unit': item.ingredient.measurement_unit,
+                'amount': item.amount,
+            }
+            for item in recipe.ingredientinrecipe_set.all()
+        ],
+        'name': recipe.name,
+        'image': get_file_url(recipe.image),
+        'image_variants': get_variant_urls(recipe.image),
+        'image_status': recipe.image_status,
+        'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+    }
+
+
+def rebuild_recipe_cards(recipe_ids):
+    """Функция пересборки карточек рецептов в одной транзакции."""
+    recipe_ids = iter(recipe_ids)
+    with transaction.atomic():
+        while True:
+            batch = list(islice(recipe_ids, cnsts.RECIPE_CARDS_BATCH_SIZE))
+            if not batch:
+                break
+            recipes = Recipe.objects.filter(id__in=batch).select_related(
+                'author'
+            ).prefetch_related(
+                'tags',
+                Prefetch(
+                    'ingredientinrecipe_set',
+                    queryset=IngredientInRecipe.objects.select_related(
+                        'ingredient'
+                    )
+                )
+            )
+            RecipeCard.objects.filter(recipe_id__in=batch).delete()
+            RecipeCard.objects.bulk_create(
+                RecipeCard(recipe=recipe, data=build_recipe_card(recipe))
+                for recipe in recipes
+            )
+
+
+def rebuild_recipe_cards_on_commit(recipes):
+    """Функция пересборки карточек после фиксации текущей транзакции.
+
+    ``recipes`` — набор запросов рецептов; id вычисляются сразу, пока
+    связи ещё существуют. Кэш ответов рецептов инвалидируется.
+    """
+    recipe_ids = list(
+        recipes.order_by().values_list('id', flat=True).distinct()
+    )
+    if not recipe_ids:
+        return
+
+    def rebuild():
+        rebuild_recipe_cards(recipe_ids)
+        bump_recipes_generation()
+
+    transaction.on_commit(rebuild)
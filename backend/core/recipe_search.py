@@ -0,0 +1,113 @@
+import threading
+import time
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector
+)
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Case, F, FloatField, Value, When
+
+import core.constants as cnsts
+from core.catalogs import get_catalog_generation_key, invalidate_catalog
+from core.search import TextIndex
+from recipes.models import Recipe
+
+SEARCH_CONFIG = 'russian'
+
+NAME_WEIGHT = 1.0
+
+TEXT_WEIGHT = 0.4
+
+RECIPE_SEARCH = 'recipe_search'
+
+
+def is_postgres(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def invalidate_local_index():
+    """Функция пометки локальных индексов устаревшими после фиксации."""
+    transaction.on_commit(lambda: invalidate_catalog(RECIPE_SEARCH))
+
+
+class LocalRecipeIndex:
+    """Поисковый индекс рецептов в памяти процесса для баз без tsvector.
+
+    Строится при первом поиске и, как снимки справочников, пересобирается
+    после ``invalidate_local_index`` в любом процессе или по истечении
+    ``CATALOG_SNAPSHOT_TIMEOUT``.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._generation = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, generation):
+        return (
+            self._index is not None
+            and self._generation == generation
+            and time.monotonic() - self._built_at
+            < cnsts.CATALOG_SNAPSHOT_TIMEOUT
+        )
+
+    def get(self):
+        generation = cache.get(get_catalog_generation_key(RECIPE_SEARCH))
+        if not self.is_fresh(generation):
+            with self._lock:
+                if not self.is_fresh(generation):
+                    self._index = self.build()
+                    self._generation = generation
+                    self._built_at = time.monotonic()
+        return self._index
+
+    @staticmethod
+    def build():
+        index = TextIndex()
+        for pk, name, text in Recipe.objects.values_list(
+            'id', 'name', 'text'
+        ).iterator():
+            index.add(pk, ((name, NAME_WEIGHT), (text, TEXT_WEIGHT)))
+        return index
+
+
+local_index = LocalRecipeIndex()
+
+
+def index_recipe(recipe):
+    """Функция обновления поискового индекса одного рецепта."""
+    if is_postgres(recipe._state.db):
+        Recipe.objects.using(recipe._state.db).filter(pk=recipe.pk).update(
+            search_vector=(
+                SearchVector('name', weight='A', config=SEARCH_CONFIG)
+                + SearchVector('text', weight='B', config=SEARCH_CONFIG)
+            )
+        )
+    else:
+        invalidate_local_index()
+
+
+def unindex_recipe(recipe):
+    if not is_postgres(recipe._state.db):
+        invalidate_local_index()
+
+
+def search_recipes(queryset, value):
+    """Функция полнотекстового поиска с сортировкой по релевантности."""
+    if is_postgres(queryset.db):
+        query = SearchQuery(value, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-pub_date')
+    scores = local_index.get().search(value)
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(
+            *(When(pk=pk, then=Value(score)) for pk, score in scores.items()),
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    ).order_by('-search_rank', '-pub_date')
@@ -0,0 +1,67 @@
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+import core.constants as cnsts
+
+RECIPES_GENERATION_KEY = 'recipes:generation'
+
+
+def get_recipes_generation():
+    """Функция получения текущего поколения кэша рецептов."""
+    generation = cache.get(RECIPES_GENERATION_KEY)
+    if generation is None:
+        cache.add(RECIPES_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(RECIPES_GENERATION_KEY)
+    return generation
+
+
+def bump_recipes_generation():
+    """Функция инвалидации кэша рецептов после фиксации транзакции.
+
+    Старые записи не удаляются, а перестают совпадать по ключу и
+    вытесняются по таймауту.
+    """
+    def bump():
+        try:
+            cache.incr(RECIPES_GENERATION_KEY)
+        except ValueError:
+            cache.set(RECIPES_GENERATION_KEY, time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def get_response_cache_key(request):
+    """Функция построения ключа кэша по пути и нормализованным параметрам."""
+    params = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    return (
+        f'recipes:{get_recipes_generation()}:{request.scheme}:'
+        f'{request.get_host()}:{request.path}?{params}'
+    )
+
+
+def cached_anonymous_response(handler):
+    """Декоратор кэширования ответов для неаутентифицированных запросов."""
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(view, request, *args, **kwargs)
+        key = get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(view, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, cnsts.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
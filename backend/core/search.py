@@ -0,0 +1,189 @@
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+import core.constants as cnsts
+
+MAX_CHAR = chr(0x10FFFF)
+
+WORD_RE = re.compile(r'\w+')
+
+RV_RE = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+PERFECTIVE_GERUND_RE = re.compile(
+    r'(ив|ивши|ившись|ыв|ывши|ывшись|((?<=[ая])(в|вши|вшись)))$'
+)
+REFLEXIVE_RE = re.compile(r'(с[яь])$')
+ADJECTIVE_RE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE_RE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB_RE = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|'
+    r'ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|((?<=[ая])(ла|на|ете|йте|ли|'
+    r'й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN_RE = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    r'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL_RE = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+DERIVATIONAL_SUFFIX_RE = re.compile(r'ость?$')
+SUPERLATIVE_RE = re.compile(r'(ейше|ейш)$')
+
+
+def stem(word):
+    """Функция выделения основы русского слова по алгоритму Портера."""
+    word = word.casefold().replace('ё', 'е')
+    match = RV_RE.match(word)
+    if not match:
+        return word
+    start, rv = match.groups()
+    stripped = PERFECTIVE_GERUND_RE.sub('', rv, 1)
+    if stripped != rv:
+        rv = stripped
+    else:
+        rv = REFLEXIVE_RE.sub('', rv, 1)
+        stripped = ADJECTIVE_RE.sub('', rv, 1)
+        if stripped != rv:
+            rv = PARTICIPLE_RE.sub('', stripped, 1)
+        else:
+            stripped = VERB_RE.sub('', rv, 1)
+            rv = NOUN_RE.sub('', rv, 1) if stripped == rv else stripped
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    if DERIVATIONAL_RE.match(rv):
+        rv = DERIVATIONAL_SUFFIX_RE.sub('', rv, 1)
+    if rv.endswith('ь'):
+        rv = rv[:-1]
+    else:
+        rv = SUPERLATIVE_RE.sub('', rv, 1)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    return start + rv
+
+
+def get_stems(value):
+    return [stem(word) for word in WORD_RE.findall(value)]
+
+
+def get_trigrams(value):
+    """Функция разбиения строки на триграммы по правилам pg_trgm."""
+    trigrams = set()
+    for word in WORD_RE.findall(value.casefold()):
+        padded = f'  {word} '
+        trigrams.update(
+            padded[index:index + 3] for index in range(len(padded) - 2)
+        )
+    return trigrams
+
+
+class PrefixIndex:
+    """Отсортированный индекс строк для поиска по префиксу через bisect.
+
+    Сравнение регистронезависимое, результаты упорядочены по названию
+    и id, как и выдача из базы данных.
+    """
+
+    def __init__(self, rows, field='name'):
+        entries = sorted(
+            (row[field].casefold(), row['id'], row) for row in rows
+        )
+        self.keys = [(key, pk) for key, pk, _ in entries]
+        self.rows = [row for _, _, row in entries]
+
+    def search(self, prefix, limit=None):
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, (prefix,))
+        end = bisect_left(self.keys, (prefix + MAX_CHAR,), start)
+        if limit and limit > 0:
+            end = min(end, start + limit)
+        return self.rows[start:end]
+
+
+class TrigramIndex:
+    """Инвертированный индекс триграмм для поиска с опечатками.
+
+    Кандидаты ранжируются по сходству Жаккара, как ``similarity`` в
+    pg_trgm. Списки вхождений обходятся от редких триграмм к частым, и
+    обход прерывается по исчерпании ``FUZZY_SEARCH_BUDGET``.
+    """
+
+    def __init__(self, rows, field='name'):
+        self.field = field
+        self.rows = list(rows)
+        self.sizes = []
+        self.postings = defaultdict(list)
+        for position, row in enumerate(self.rows):
+            trigrams = get_trigrams(row[field])
+            self.sizes.append(len(trigrams))
+            for trigram in trigrams:
+                self.postings[trigram].append(position)
+
+    def search(self, query, limit=None):
+        trigrams = get_trigrams(query)
+        if not trigrams:
+            return []
+        deadline = time.perf_counter() + cnsts.FUZZY_SEARCH_BUDGET
+        shared = Counter()
+        for trigram in sorted(
+            trigrams, key=lambda trigram: len(self.postings.get(trigram, ()))
+        ):
+            shared.update(self.postings.get(trigram, ()))
+            if time.perf_counter() > deadline:
+                break
+        scored = []
+        for position, count in shared.items():
+            similarity = count / (
+                len(trigrams) + self.sizes[position] - count
+            )
+            if similarity >= cnsts.FUZZY_SEARCH_THRESHOLD:
+                row = self.rows[position]
+                scored.append((-similarity, row[self.field], row['id'], row))
+        scored.sort(key=lambda item: item[:3])
+        limit = limit if limit and limit > 0 else cnsts.FUZZY_SEARCH_LIMIT
+        return [row for *_, row in scored[:limit]]
+
+
+class TextIndex:
+    """Инвертированный индекс основ слов с весами полей.
+
+    Поиск требует совпадения всех слов запроса; релевантность — сумма
+    весов вхождений, умноженных на idf основы.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.documents = {}
+
+    def add(self, doc_id, weighted_fields):
+        self.remove(doc_id)
+        weights = Counter()
+        for value, weight in weighted_fields:
+            for term in get_stems(value):
+                weights[term] += weight
+        for term, weight in weights.items():
+            self.postings[term][doc_id] = weight
+        self.documents[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        for term in self.documents.pop(doc_id, ()):
+            self.postings[term].pop(doc_id, None)
+
+    def search(self, query):
+        terms = set(get_stems(query))
+        if not terms:
+            return {}
+        postings = sorted(
+            (self.postings.get(term, {}) for term in terms), key=len
+        )
+        scores = dict.fromkeys(postings[0], 0.0)
+        for posting in postings:
+            idf = math.log(1 + len(self.documents) / (1 + len(posting)))
+            scores = {
+                doc_id: score + posting[doc_id] * idf
+                for doc_id, score in scores.items() if doc_id in posting
+            }
+        return scores
@@ -1,30 +1,63 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from core.images import get_image_variants
 from recipes.models import Recipe
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Адреса уменьшенных вариантов изображения и их srcset."""
+
+    def to_representation(self, value):
+        return get_image_variants(value, self.context.get('request'))
+
+
 class ShortRecipeSerializer(serializers.ModelSerializer):
     """Упрощённый сериализатор рецепта для возврата при добавлении."""
 
     image = serializers.ImageField()
+    image_variants = ImageVariantsField(source='image')
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
-class BaseFavoriteShoppingCartSerializer(serializers.ModelSerializer):
-    """Базовый сериализатор для избранного и списка покупок."""
+class CreateOnConflictMixin:
+    """Создание одной вставкой: нарушение уникальности даёт ошибку 400.
+
+    Вместо предварительной проверки существования запись сразу
+    вставляется, поэтому двойной запрос не приводит к ошибке 500.
+    """
+
+    conflict_message = None
 
-    def validate(self, data):
-        if self.Meta.model.objects.filter(
-            user=self.context['request'].user,
-            recipe=data['recipe']
-        ).exists():
+    def get_conflict_message(self):
+        return self.conflict_message
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
-                f'Рецепт уже добавлен в {self.Meta.model._meta.verbose_name}.'
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.get_conflict_message()
+                ]},
+                code='unique'
             )
-        return data
+
+
+class BaseFavoriteShoppingCartSerializer(
+    CreateOnConflictMixin, serializers.ModelSerializer
+):
+    """Базовый сериализатор для избранного и списка покупок."""
+
+    def get_conflict_message(self):
+        return (
+            f'Рецепт уже добавлен в {self.Meta.model._meta.verbose_name}.'
+        )
 
     def to_representation(self, instance):
         return ShortRecipeSerializer(
@@ -1,7 +1,138 @@
-def generate_shopping_list_text(ingredients):
-    lines = ['Список покупок:\n']
+import csv
+import json
+from collections import Counter, namedtuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from recipes.models import IngredientInRecipe, ShoppingCart, ShoppingListItem
+from users.models import User
+
+
+ExportFormat = namedtuple('ExportFormat', ('stream', 'content_type'))
+
+
+class EchoBuffer:
+    """Буфер, возвращающий записанную строку вместо её хранения."""
+
+    def write(self, value):
+        return value
+
+
+def stream_shopping_list_text(ingredients):
+    yield 'Список покупок:\n'
     for item in ingredients:
-        lines.append(
-            f'{item["name"]} - {item["total_amount"]} {item["unit"]}\n'
+        yield f'{item["name"]} - {item["total_amount"]} {item["unit"]}\n'
+
+
+def stream_shopping_list_csv(ingredients):
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(('name', 'amount', 'unit'))
+    for item in ingredients:
+        yield writer.writerow(
+            (item['name'], item['total_amount'], item['unit'])
+        )
+
+
+def stream_shopping_list_json(ingredients):
+    separator = '['
+    for item in ingredients:
+        yield separator + json.dumps({
+            'name': item['name'],
+            'amount': item['total_amount'],
+            'unit': item['unit'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': ExportFormat(
+        stream_shopping_list_text, 'text/plain; charset=utf-8'
+    ),
+    'csv': ExportFormat(stream_shopping_list_csv, 'text/csv; charset=utf-8'),
+    'json': ExportFormat(
+        stream_shopping_list_json, 'application/json; charset=utf-8'
+    ),
+}
+
+
+def get_recipe_amounts(recipe_id):
+    """Функция получения количеств ингредиентов рецепта по их id."""
+    return dict(IngredientInRecipe.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('ingredient_id', 'amount'))
+
+
+def get_recipes_amounts(recipe_ids):
+    """Функция суммирования количеств ингредиентов нескольких рецептов."""
+    return dict(IngredientInRecipe.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values('ingredient_id').annotate(
+        total=Sum('amount')
+    ).order_by().values_list('ingredient_id', 'total'))
+
+
+def get_amounts_delta(old_amounts, new_amounts):
+    delta = Counter(new_amounts)
+    delta.subtract(old_amounts)
+    return {
+        ingredient_id: amount
+        for ingredient_id, amount in delta.items() if amount
+    }
+
+
+def get_cart_user_ids(recipe_id):
+    return list(ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+
+
+@transaction.atomic
+def apply_shopping_list_delta(user_ids, delta):
+    """Функция применения изменений количеств к спискам покупок.
+
+    delta — словарь {id ингредиента: изменение количества}; позиции с
+    нулевым итогом удаляются. Изменения списков одного пользователя
+    выполняются по очереди под блокировкой его записи: блокировка
+    позиций не защищает от одновременного создания недостающих.
+    """
+    delta = {key: value for key, value in delta.items() if value}
+    if not user_ids or not delta:
+        return
+    list(User.objects.select_for_update(no_key=True).filter(
+        id__in=user_ids
+    ).order_by('id').values_list('id', flat=True))
+    items = {
+        (item.user_id, item.ingredient_id): item
+        for item in ShoppingListItem.objects.select_for_update().filter(
+            user_id__in=user_ids, ingredient_id__in=delta
         )
-    return ''.join(lines)
+    }
+    to_create, to_update, to_delete = [], [], []
+    for user_id in user_ids:
+        for ingredient_id, amount in delta.items():
+            item = items.get((user_id, ingredient_id))
+            if item is None:
+                if amount > 0:
+                    to_create.append(ShoppingListItem(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        total_amount=amount
+                    ))
+                continue
+            item.total_amount += amount
+            if item.total_amount > 0:
+                to_update.append(item)
+            else:
+                to_delete.append(item.pk)
+    ShoppingListItem.objects.bulk_create(to_create)
+    ShoppingListItem.objects.bulk_update(to_update, ('total_amount',))
+    ShoppingListItem.objects.filter(pk__in=to_delete).delete()
+
+
+def apply_recipe_amounts_change(recipe_id, old_amounts, new_amounts):
+    """Функция обновления списков покупок после изменения рецепта."""
+    delta = get_amounts_delta(old_amounts, new_amounts)
+    if delta:
+        apply_shopping_list_delta(get_cart_user_ids(recipe_id), delta)
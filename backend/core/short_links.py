@@ -1,15 +1,201 @@
 import base64
+import string
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+import core.constants as cnsts
+from core.catalogs import get_catalog_generation_key, invalidate_catalog
+from recipes.models import Recipe
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+SHORT_LINK_SALT = 'core.short_links'
+
+RECIPE_IDS = 'recipe_ids'
+
+RECIPE_IDS_MAX_KEY = 'recipe_ids:max'
+
+
+def to_base62(number):
+    """Функция записи неотрицательного числа в base62."""
+    digits = []
+    while True:
+        number, remainder = divmod(number, len(BASE62_ALPHABET))
+        digits.append(BASE62_ALPHABET[remainder])
+        if not number:
+            return ''.join(reversed(digits))
+
+
+def from_base62(encoded):
+    """Функция чтения числа из base62; None для посторонних символов."""
+    number = 0
+    for char in encoded:
+        digit = BASE62_ALPHABET.find(char)
+        if digit < 0:
+            return None
+        number = number * len(BASE62_ALPHABET) + digit
+    return number
+
+
+def get_signature(recipe_id):
+    """Функция вычисления подписи id для короткой ссылки."""
+    digest = salted_hmac(SHORT_LINK_SALT, str(recipe_id)).digest()
+    return ''.join(
+        BASE62_ALPHABET[byte % len(BASE62_ALPHABET)]
+        for byte in digest[:cnsts.SHORT_LINK_SIGNATURE_LENGTH]
+    )
 
 
 def encode_id(recipe_id: int) -> str:
-    """Функция кодирования id рецепта для короткой ссылки."""
-    return base64.urlsafe_b64encode(f"{recipe_id}".encode()).decode()
+    """Функция кодирования id рецепта для короткой ссылки.
 
+    Код — id в base62 и подпись HMAC, проверяемая без обращения к БД.
+    """
+    return f'{to_base62(recipe_id)}{get_signature(recipe_id)}'
 
-def decode_id(encoded: str) -> int:
-    """Функция декодирования id рецепта в короткой ссылки."""
+
+def decode_signed_id(encoded):
+    """Функция декодирования подписанного кода; None при неверной подписи."""
+    if len(encoded) <= cnsts.SHORT_LINK_SIGNATURE_LENGTH:
+        return None
+    recipe_id = from_base62(encoded[:-cnsts.SHORT_LINK_SIGNATURE_LENGTH])
+    if recipe_id is None or not constant_time_compare(
+        encoded[-cnsts.SHORT_LINK_SIGNATURE_LENGTH:],
+        get_signature(recipe_id)
+    ):
+        return None
+    return recipe_id
+
+
+def decode_legacy_id(encoded):
+    """Функция декодирования кодов прежнего формата (base64 от id)."""
     try:
         decoded = base64.urlsafe_b64decode(encoded).decode()
         return int(decoded)
     except Exception:
         return None
+
+
+def decode_id(encoded: str) -> int:
+    """Функция декодирования id рецепта в короткой ссылки."""
+    recipe_id = decode_signed_id(encoded)
+    if recipe_id is None:
+        return decode_legacy_id(encoded)
+    return recipe_id
+
+
+def invalidate_recipe_ids():
+    """Функция пометки множества id устаревшим после фиксации."""
+    transaction.on_commit(lambda: invalidate_catalog(RECIPE_IDS))
+
+
+def add_recipe_id(recipe_id):
+    """Функция добавления id нового рецепта после фиксации.
+
+    Множество текущего процесса дополняется сразу, остальным процессам
+    публикуется наибольший id. Если уже опубликован больший id (транзакции
+    зафиксированы не по порядку), множества пересобираются целиком.
+    """
+    def add():
+        recipe_ids.add(recipe_id)
+        if recipe_id > (cache.get(RECIPE_IDS_MAX_KEY) or 0):
+            cache.set(RECIPE_IDS_MAX_KEY, recipe_id, None)
+        else:
+            invalidate_catalog(RECIPE_IDS)
+
+    transaction.on_commit(add)
+
+
+class RecipeIdSet:
+    """Битовая карта id существующих рецептов в памяти процесса.
+
+    Пересобирается одним запросом после ``invalidate_recipe_ids``
+    (удаление рецепта) или по истечении ``CATALOG_SNAPSHOT_TIMEOUT``,
+    как снимки справочников. Новые рецепты не пересобирают карту: id
+    больше известного дочитываются запросом ``id > max``, когда другой
+    процесс опубликовал больший id, и не чаще
+    ``RECIPE_IDS_REFRESH_INTERVAL`` в остальных случаях.
+    """
+
+    def __init__(self):
+        self._bitmap = None
+        self._max_id = 0
+        self._generation = None
+        self._built_at = 0
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, generation):
+        return (
+            self._bitmap is not None
+            and self._generation == generation
+            and time.monotonic() - self._built_at
+            < cnsts.CATALOG_SNAPSHOT_TIMEOUT
+        )
+
+    def get(self):
+        generation = cache.get(get_catalog_generation_key(RECIPE_IDS))
+        if not self.is_fresh(generation):
+            with self._lock:
+                if not self.is_fresh(generation):
+                    published_max_id = cache.get(RECIPE_IDS_MAX_KEY) or 0
+                    self._bitmap = bytearray()
+                    self._max_id = 0
+                    self.extend(Recipe.objects.values_list(
+                        'id', flat=True
+                    ).iterator())
+                    self._max_id = max(self._max_id, published_max_id)
+                    self._generation = generation
+                    self._built_at = self._checked_at = time.monotonic()
+        return self._bitmap
+
+    def extend(self, ids):
+        for recipe_id in ids:
+            if recipe_id >= len(self._bitmap) * 8:
+                self._bitmap.extend(
+                    bytes(recipe_id // 8 + 1 - len(self._bitmap))
+                )
+            self._bitmap[recipe_id >> 3] |= 1 << (recipe_id & 7)
+            self._max_id = max(self._max_id, recipe_id)
+
+    def add(self, recipe_id):
+        with self._lock:
+            if self._bitmap is not None:
+                self.extend((recipe_id,))
+
+    def refresh(self):
+        """Дочитывает рецепты, созданные после известного наибольшего id.
+
+        Опубликованный до запроса id считается известным, даже если
+        рецепт с ним уже удалён.
+        """
+        with self._lock:
+            now = time.monotonic()
+            published_max_id = cache.get(RECIPE_IDS_MAX_KEY) or 0
+            if (
+                published_max_id <= self._max_id
+                and now - self._checked_at
+                < cnsts.RECIPE_IDS_REFRESH_INTERVAL
+            ):
+                return
+            self._checked_at = now
+            self.extend(Recipe.objects.filter(
+                id__gt=self._max_id
+            ).values_list('id', flat=True).iterator())
+            self._max_id = max(self._max_id, published_max_id)
+
+    def __contains__(self, recipe_id):
+        bitmap = self.get()
+        if recipe_id > self._max_id:
+            self.refresh()
+        return (
+            0 < recipe_id < len(bitmap) * 8
+            and bool(bitmap[recipe_id >> 3] >> (recipe_id & 7) & 1)
+        )
+
+
+recipe_ids = RecipeIdSet()
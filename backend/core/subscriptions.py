@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from recipes.models import Recipe
+from users.models import Follow
+
+TOP_RECIPES_ORDERING = (F('pub_date').desc(), F('id').desc())
+
+
+def get_subscribed_author_ids(request):
+    """Функция получения id авторов, на которых подписан пользователь.
+
+    Множество загружается одним запросом и кэшируется на объекте запроса,
+    поэтому все вложенные сериализаторы пользователей переиспользуют его.
+    """
+    author_ids = getattr(request, '_subscribed_author_ids', None)
+    if author_ids is None:
+        author_ids = set(Follow.objects.filter(
+            user=request.user
+        ).values_list('author_id', flat=True))
+        request._subscribed_author_ids = author_ids
+    return author_ids
+
+
+def get_recipes_limit(request):
+    """Функция чтения recipes_limit; None, если лимит не задан."""
+    try:
+        limit = int(request.query_params.get('recipes_limit'))
+    except (TypeError, ValueError):
+        return None
+    return limit if limit >= 0 else None
+
+
+def get_top_recipes(author_ids, limit):
+    """Функция выборки последних limit рецептов каждого автора.
+
+    Рецепты нумеруются внутри автора оконной функцией
+    ``ROW_NUMBER() OVER (PARTITION BY author_id ...)``, поэтому все
+    авторы страницы обслуживаются одним запросом.
+    """
+    recipes = Recipe.objects.filter(author_id__in=author_ids)
+    if limit is not None:
+        ranked = recipes.annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=F('author_id'),
+            order_by=TOP_RECIPES_ORDERING
+        )).values('id', 'row_number').order_by()
+        sql, params = ranked.query.sql_with_params()
+        recipes = Recipe.objects.filter(id__in=RawSQL(
+            f'SELECT ranked.id FROM ({sql}) ranked '
+            'WHERE ranked.row_number <= %s',
+            (*params, limit)
+        ))
+    return recipes.only(
+        'id', 'name', 'image', 'cooking_time', 'author_id'
+    ).order_by(*TOP_RECIPES_ORDERING)
+
+
+def attach_top_recipes(authors, limit):
+    """Функция прикрепления последних рецептов к авторам в top_recipes."""
+    recipes_by_author = defaultdict(list)
+    for recipe in get_top_recipes([author.id for author in authors], limit):
+        recipes_by_author[recipe.author_id].append(recipe)
+    for author in authors:
+        author.top_recipes = recipes_by_author[author.id]
+    return authors
@@ -0,0 +1,65 @@
+from django.db import IntegrityError, connections, transaction
+
+
+def get_columns(model):
+    connection = connections[model.objects.db]
+    return connection, [
+        connection.ops.quote_name(name) for name in (
+            model._meta.db_table,
+            model._meta.get_field('user').column,
+            model._meta.get_field('recipe').column,
+        )
+    ]
+
+
+def add_user_recipes(model, user, recipe_ids):
+    """Функция добавления связей пользователя с рецептами.
+
+    Возвращает id рецептов, строки которых вставлены этим вызовом: уже
+    существующие, в том числе добавленные параллельным запросом,
+    пропускаются. Сигналы post_save не отправляются.
+    """
+    connection, (table, user_column, recipe_column) = get_columns(model)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({user_column}, {recipe_column}) '
+                'SELECT %s, UNNEST(%s::integer[]) '
+                f'ON CONFLICT DO NOTHING RETURNING {recipe_column}',
+                (user.id, list(recipe_ids))
+            )
+            return [row[0] for row in cursor.fetchall()]
+    created_ids = []
+    for recipe_id in recipe_ids:
+        try:
+            with transaction.atomic(using=connection.alias):
+                model.objects.bulk_create(
+                    (model(user=user, recipe_id=recipe_id),)
+                )
+        except IntegrityError:
+            continue
+        created_ids.append(recipe_id)
+    return created_ids
+
+
+def remove_user_recipes(model, user, recipe_ids):
+    """Функция удаления связей пользователя с рецептами.
+
+    Возвращает id рецептов, строки которых удалены этим вызовом.
+    Сигналы pre_delete и post_delete не отправляются.
+    """
+    connection, (table, user_column, recipe_column) = get_columns(model)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {user_column} = %s '
+                f'AND {recipe_column} = ANY(%s) RETURNING {recipe_column}',
+                (user.id, list(recipe_ids))
+            )
+            return [row[0] for row in cursor.fetchall()]
+    return [
+        recipe_id for recipe_id in recipe_ids
+        if model.objects.filter(
+            user=user, recipe_id=recipe_id
+        )._raw_delete(connection.alias)
+    ]
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram_backend.settings")
 
 application = get_wsgi_application()
+
+from core.catalogs import warm_catalogs  # noqa: E402
+
+warm_catalogs()
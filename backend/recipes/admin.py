@@ -2,10 +2,10 @@ from django.contrib import admin
 from django.contrib.auth.models import Group
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Count
 from django.contrib.admin import SimpleListFilter
 
 import core.constants as cnsts
+from core.shopping_cart import apply_recipe_amounts_change, get_recipe_amounts
 from .models import (Favorite, Ingredient, IngredientInRecipe,
                      Recipe, ShoppingCart, Tag)
 
@@ -65,10 +65,10 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'name', 'author', 'cooking_time', 'pub_date',
         'display_tags', 'display_ingredients',
-        'favorite_count', 'image_preview',
+        'favorites_count', 'image_preview',
     )
     list_display_links = ('name',)
-    readonly_fields = ('image_preview', 'favorite_count')
+    readonly_fields = ('image_preview', 'favorites_count')
     search_fields = ('name', 'author__username')
     list_filter = ('tags', CookingTimeFilter)
     inlines = (IngredientInRecipeInline,)
@@ -79,10 +79,18 @@ class RecipeAdmin(admin.ModelAdmin):
             queryset
             .select_related('author')
             .prefetch_related('tags', 'ingredients')
-            .annotate(favorite_count=Count('in_favorites'))
             .order_by('-pub_date')
         )
 
+    def save_related(self, request, form, formsets, change):
+        old_amounts = get_recipe_amounts(form.instance.id)
+        super().save_related(request, form, formsets, change)
+        apply_recipe_amounts_change(
+            form.instance.id,
+            old_amounts,
+            get_recipe_amounts(form.instance.id)
+        )
+
     @admin.display(description='Теги')
     def display_tags(self, obj):
         return ', '.join(tag.name for tag in obj.tags.all())
@@ -97,10 +105,6 @@ class RecipeAdmin(admin.ModelAdmin):
             f'<img src="{obj.image.url}" width="180" height="160">'
         )
 
-    @admin.display(description='В избранном (раз)')
-    def favorite_count(self, obj):
-        return obj.favorite_count
-
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -55,6 +56,38 @@ class Ingredient(models.Model):
         return self.name
 
 
+class ImageStatus(models.TextChoices):
+    """Состояние фоновой обработки изображения."""
+
+    PROCESSING = 'processing', 'Обрабатывается'
+    READY = 'ready', 'Готово'
+    FAILED = 'failed', 'Ошибка обработки'
+
+
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов рецептов с флагами текущего пользователя."""
+
+    def with_viewer_flags(self, user):
+        """Добавляет is_favorited и is_in_shopping_cart одним запросом."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(Favorite.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+            is_in_shopping_cart=models.Exists(ShoppingCart.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+        )
+
+
 class Recipe(models.Model):
     """Модель произведения."""
 
@@ -84,6 +117,13 @@ class Recipe(models.Model):
         'Фото',
         upload_to='recipes/images/'
     )
+    image_status = models.CharField(
+        'Состояние фото',
+        max_length=cnsts.MAX_IMAGE_STATUS_LENGTH,
+        choices=ImageStatus.choices,
+        default=ImageStatus.READY,
+        editable=False
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -104,17 +144,55 @@ class Recipe(models.Model):
         verbose_name='дата публикации',
         auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном (раз)',
+        default=0,
+        editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'recipes'
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
 
 
+class RecipeCard(models.Model):
+    """Модель денормализованной карточки рецепта для списков."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card',
+        verbose_name='Рецепт'
+    )
+    data = models.JSONField('Данные карточки')
+
+    class Meta:
+        verbose_name = 'карточка рецепта'
+        verbose_name_plural = 'Карточки рецептов'
+
+    def __str__(self):
+        return str(self.recipe_id)
+
+
 class IngredientInRecipe(models.Model):
     """Модель ингредиента в рецепте."""
 
@@ -182,3 +260,68 @@ class ShoppingCart(BaseUserRecipe):
     class Meta(BaseUserRecipe.Meta):
         verbose_name = 'список покупок'
         verbose_name_plural = 'Списки покупок'
+
+
+class ShoppingListItem(models.Model):
+    """Модель суммарного количества ингредиента в списке покупок."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='Ингредиент'
+    )
+    total_amount = models.PositiveIntegerField('Общее количество')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'ingredient'),
+                                    name='%(class)s_unique_user_ingredient'),
+        )
+        verbose_name = 'позиция списка покупок'
+        verbose_name_plural = 'Позиции списков покупок'
+
+    def __str__(self):
+        return f'{self.user}: {self.ingredient} — {self.total_amount}'
+
+
+class FeedEntry(models.Model):
+    """Модель записи ленты подписок пользователя."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт'
+    )
+    pub_date = models.DateTimeField('Дата публикации рецепта')
+
+    class Meta:
+        ordering = ('-pub_date', '-recipe')
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'recipe'),
+                                    name='%(class)s_unique_user_recipe'),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='feedentry_user_pub_date_idx'
+            ),
+        )
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+
+    def __str__(self):
+        return f'{self.user}: {self.recipe}'
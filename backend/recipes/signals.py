@@ -0,0 +1,186 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from core.catalogs import invalidate_catalog
+from core.counters import shift_counter, shift_counters
+from core.feed import (
+    add_author_to_feed,
+    fan_out_recipe,
+    remove_author_from_feed
+)
+from core.images import avatar_rejected, recipe_image_processed
+from core.recipe_cards import (
+    rebuild_recipe_cards,
+    rebuild_recipe_cards_on_commit
+)
+from core.recipe_search import index_recipe, unindex_recipe
+from core.response_cache import bump_recipes_generation
+from core.shopping_cart import (
+    apply_shopping_list_delta,
+    get_recipe_amounts,
+    get_recipes_amounts
+)
+from core.short_links import add_recipe_id, invalidate_recipe_ids
+from users.models import Follow, User
+
+# Отправляется после bulk_create связей пользователя с рецептами,
+# для которого post_save не вызывается. Аргументы: user, recipe_ids.
+user_recipes_bulk_created = Signal()
+# То же для удаления без pre_delete и post_delete.
+user_recipes_bulk_deleted = Signal()
+
+# Поля, сохраняемые при входе и смене пароля: на карточки не влияют.
+AUTH_ONLY_USER_FIELDS = {'last_login', 'password'}
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags_catalog(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_catalog('tags'))
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredients_catalog(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_catalog('ingredients'))
+
+
+@receiver((post_save, pre_delete), sender=Tag)
+def rebuild_tag_recipe_cards(sender, instance, **kwargs):
+    rebuild_recipe_cards_on_commit(Recipe.objects.filter(tags=instance))
+
+
+@receiver((post_save, pre_delete), sender=Ingredient)
+def rebuild_ingredient_recipe_cards(sender, instance, **kwargs):
+    rebuild_recipe_cards_on_commit(
+        Recipe.objects.filter(ingredients=instance)
+    )
+
+
+@receiver(post_save, sender=User)
+def rebuild_author_recipe_cards(sender, instance, created, update_fields,
+                                **kwargs):
+    if created or (
+        update_fields and set(update_fields) <= AUTH_ONLY_USER_FIELDS
+    ):
+        return
+    rebuild_recipe_cards_on_commit(Recipe.objects.filter(author=instance))
+
+
+@receiver(avatar_rejected, sender=User)
+def rebuild_rejected_avatar_cards(sender, user_id, **kwargs):
+    rebuild_recipe_cards_on_commit(Recipe.objects.filter(author_id=user_id))
+
+
+@receiver(recipe_image_processed, sender=Recipe)
+def rebuild_processed_recipe_card(sender, recipe_id, **kwargs):
+    rebuild_recipe_cards((recipe_id,))
+
+
+@receiver(post_save, sender=Recipe)
+def rebuild_saved_recipe_card(sender, instance, **kwargs):
+    rebuild_recipe_cards_on_commit(Recipe.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_deleted_recipe(sender, **kwargs):
+    bump_recipes_generation()
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_index(sender, instance, **kwargs):
+    index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_search_index(sender, instance, **kwargs):
+    unindex_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def publish_recipe_id(sender, instance, created, **kwargs):
+    if created:
+        add_recipe_id(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_id(sender, **kwargs):
+    invalidate_recipe_ids()
+
+
+@receiver(post_save, sender=Recipe)
+def push_recipe_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: fan_out_recipe(instance))
+
+
+@receiver(post_save, sender=Follow)
+def fill_follower_feed(sender, instance, created, **kwargs):
+    if created:
+        add_author_to_feed(instance.user_id, instance.author)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_follower_feed(sender, instance, **kwargs):
+    remove_author_from_feed(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    shift_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    shift_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        apply_shopping_list_delta(
+            (instance.user_id,), get_recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_shopping_list(sender, instance, **kwargs):
+    apply_shopping_list_delta((instance.user_id,), {
+        ingredient_id: -amount for ingredient_id, amount
+        in get_recipe_amounts(instance.recipe_id).items()
+    })
+
+
+@receiver(user_recipes_bulk_created, sender=Favorite)
+def increment_bulk_favorites_count(sender, user, recipe_ids, **kwargs):
+    shift_counters(Recipe, recipe_ids, 'favorites_count', 1)
+
+
+@receiver(user_recipes_bulk_created, sender=ShoppingCart)
+def add_bulk_to_shopping_list(sender, user, recipe_ids, **kwargs):
+    apply_shopping_list_delta((user.id,), get_recipes_amounts(recipe_ids))
+
+
+@receiver(user_recipes_bulk_deleted, sender=Favorite)
+def decrement_bulk_favorites_count(sender, user, recipe_ids, **kwargs):
+    shift_counters(Recipe, recipe_ids, 'favorites_count', -1)
+
+
+@receiver(user_recipes_bulk_deleted, sender=ShoppingCart)
+def remove_bulk_from_shopping_list(sender, user, recipe_ids, **kwargs):
+    apply_shopping_list_delta((user.id,), {
+        ingredient_id: -amount for ingredient_id, amount
+        in get_recipes_amounts(recipe_ids).items()
+    })
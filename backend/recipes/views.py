@@ -1,19 +1,30 @@
-from django.http import HttpResponsePermanentRedirect
+from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
+from django.utils.cache import add_never_cache_headers, patch_cache_control
 from django.views import View
 
-from recipes.models import Recipe
-from core.short_links import decode_id
+import core.constants as cnsts
+from core.short_links import decode_id, recipe_ids
 
 
 class ShortLinkRedirectView(View):
-    """Представление для перенаправления по короткой ссылке на рецепт."""
+    """Представление для перенаправления по короткой ссылке на рецепт.
+
+    Код проверяется по подписи и битовой карте id без запроса к БД.
+    """
 
     def get(self, request, encoded):
         recipe_id = decode_id(encoded)
-        try:
-            recipe = Recipe.objects.get(id=recipe_id)
-            target_url = request.build_absolute_uri(f'/recipes/{recipe.id}/')
-        except (Recipe.DoesNotExist, TypeError):
-            target_url = request.build_absolute_uri('/not_found')
+        if recipe_id is None or recipe_id not in recipe_ids:
+            response = HttpResponseRedirect(
+                request.build_absolute_uri('/not_found')
+            )
+            add_never_cache_headers(response)
+            return response
 
-        return HttpResponsePermanentRedirect(target_url)
+        response = HttpResponsePermanentRedirect(
+            request.build_absolute_uri(f'/recipes/{recipe_id}/')
+        )
+        patch_cache_control(
+            response, public=True, max_age=cnsts.SHORT_LINK_CACHE_TIMEOUT
+        )
+        return response
@@ -1,6 +1,5 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
-from django.db.models import Count
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -30,7 +29,7 @@ class UserAdmin(DjangoUserAdmin):
     list_display = (
         'username', 'email', 'avatar', 'image_preview',
         'first_name', 'last_name', 'is_staff', 'is_active',
-        'recipes_count', 'subscriptions_on_author_count',
+        'recipes_count', 'subscribers_count',
     )
     search_fields = ('username', 'email')
     ordering = ('username',)
@@ -44,23 +43,6 @@ class UserAdmin(DjangoUserAdmin):
             )
         return 'Изображение отсутствует'
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(
-            _recipes_count=Count('recipes', distinct=True),
-            _subscriptions_on_author_count=Count(
-                'subscriptions_on_author', distinct=True
-            ),
-        )
-
-    @admin.display(description='Количество рецептов')
-    def recipes_count(self, obj):
-        return getattr(obj, '_recipes_count', 0)
-
-    @admin.display(description='Количество подписчиков')
-    def subscriptions_on_author_count(self, obj):
-        return getattr(obj, '_subscriptions_on_author_count', 0)
-
 
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Follow, User
+from core.counters import shift_counter
+
+
+@receiver(post_save, sender=Follow)
+def increment_subscribers_count(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(User, instance.author_id, 'subscribers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_subscribers_count(sender, instance, **kwargs):
+    shift_counter(User, instance.author_id, 'subscribers_count', -1)